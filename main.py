@@ -1,12 +1,15 @@
-
 import asyncio
-import json
+import logging
 import os
+import random
 import sys
-from typing import Any, Dict, List, Optional, Sequence
-from urllib.parse import urlencode
+import time
+from collections import OrderedDict
+from dataclasses import MISSING, dataclass, fields
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
 
 import httpx
+import orjson
 from dotenv import load_dotenv
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
@@ -15,8 +18,114 @@ from mcp.types import (
     Tool,
 )
 
-# Load environment variables from .env file
-load_dotenv()
+try:
+    import uvloop
+except ImportError:  # uvloop does not support Windows
+    uvloop = None
+
+# Load environment variables from .env file, unless the environment has already
+# been injected (SKIP_DOTENV=1, or the Nango secret is already present)
+if os.environ.get("SKIP_DOTENV") != "1" and not os.environ.get("NANGO_SECRET_KEY"):
+    load_dotenv()
+
+NANGO_BASE_URL = os.environ.get("NANGO_BASE_URL")
+NANGO_SECRET_KEY = os.environ.get("NANGO_SECRET_KEY")
+NANGO_CONNECTION_ID = os.environ.get("NANGO_CONNECTION_ID")
+NANGO_INTEGRATION_ID = os.environ.get("NANGO_INTEGRATION_ID")
+
+# Logs go to stderr (stdout carries the MCP protocol); at the default WARNING
+# level the per-request messages are skipped before any formatting happens
+logger = logging.getLogger("slack_mcp")
+_log_level = os.environ.get("SLACK_MCP_LOG", "WARNING").upper()
+# An unknown level name must not stop the server from starting
+logger.setLevel(_log_level if _log_level in logging.getLevelNamesMapping() else logging.WARNING)
+logger.addHandler(logging.StreamHandler(sys.stderr))
+logger.propagate = False
+
+# Bot tokens rarely change, so Nango is only asked again after this many seconds
+CREDENTIALS_TTL = 270
+# Slack errors that mean the cached bot token is no longer valid
+AUTH_ERRORS = ("invalid_auth", "token_expired")
+
+# Calls per minute Slack allows for each Web API method (its rate-limit tier)
+SLACK_RATE_LIMITS = {
+    "conversations.list": 20,
+    "users.list": 20,
+    "conversations.info": 50,
+    "conversations.history": 50,
+    "conversations.replies": 50,
+    "reactions.add": 50,
+    "chat.postMessage": 60,
+    "users.profile.get": 100,
+}
+DEFAULT_RATE_LIMIT = 50
+# Upper bound on Slack requests in flight at once
+MAX_CONCURRENT_REQUESTS = 16
+# Attempts per Slack request before a transient failure is handed back to the caller
+MAX_ATTEMPTS = 5
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Failures where the request never reached Slack, so even a POST is safe to resend
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# How long rarely-changing lookups are served from memory, in seconds
+PROFILE_CACHE_TTL = 600
+CHANNEL_CACHE_TTL = 300
+CACHE_MAXSIZE = 1024
+
+_cred_cache: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+_cred_lock = asyncio.Lock()
+
+
+class SlackAuthError(Exception):
+    """Raised when Slack rejects the bot token."""
+
+
+class TokenBucket:
+    """Paces calls to a single Slack method so bursts stay under its rate limit."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire a fixed number of seconds after being stored."""
+
+    def __init__(self, ttl: float, maxsize: int = CACHE_MAXSIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Any) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Any, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
 
 
 class SlackClient:
@@ -25,131 +134,248 @@ class SlackClient:
             "Authorization": f"Bearer {bot_token}",
             "Content-Type": "application/json",
         }
+        self.bot_token = bot_token
         self.team_id = team_id
-
-    async def get_channels(self, limit: int = 100, cursor: Optional[str] = None) -> Dict[str, Any]:
-        params = {
+        # Query parameters that are identical on every call of a method
+        self._base_channel_params = {
             "types": "public_channel",
             "exclude_archived": "true",
-            "limit": str(min(limit, 200)),
-            "team_id": self.team_id,
+            "team_id": team_id,
         }
+        self._base_user_params = {"team_id": team_id}
+        self._client = httpx.AsyncClient(
+            base_url="https://slack.com/api",
+            headers=self.bot_headers,
+            # HTTP/2 multiplexes concurrent calls over one connection, so few idle sockets are needed
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=4),
+            timeout=httpx.Timeout(30.0, connect=10.0),
+        )
+        self._sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._profile_cache = TTLCache(ttl=PROFILE_CACHE_TTL)
+        self._channel_cache = TTLCache(ttl=CHANNEL_CACHE_TTL)
+        self._inflight: Dict[Tuple[str, str], "asyncio.Task[Any]"] = {}
+
+    def set_credentials(self, bot_token: str, team_id: str) -> None:
+        """Switch to a rotated bot token while keeping the connection pool"""
+        self.bot_headers["Authorization"] = f"Bearer {bot_token}"
+        self._client.headers["Authorization"] = self.bot_headers["Authorization"]
+        self.bot_token = bot_token
+
+        if team_id != self.team_id:
+            # Cached lookups belong to the old workspace
+            self.team_id = team_id
+            self._base_channel_params["team_id"] = team_id
+            self._base_user_params["team_id"] = team_id
+            # Fresh objects rather than clear(): lookups still in flight for the old
+            # workspace hold the old cache and in-flight table and land there instead
+            self._profile_cache = TTLCache(ttl=PROFILE_CACHE_TTL)
+            self._channel_cache = TTLCache(ttl=CHANNEL_CACHE_TTL)
+            self._inflight = {}
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def __aenter__(self) -> "SlackClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    def _bucket(self, endpoint: str) -> TokenBucket:
+        bucket = self._buckets.get(endpoint)
+        if bucket is None:
+            per_minute = SLACK_RATE_LIMITS.get(endpoint, DEFAULT_RATE_LIMIT)
+            # Allow roughly ten seconds' worth of calls as a burst
+            bucket = TokenBucket(rate=per_minute / 60, capacity=max(1, per_minute // 6))
+            self._buckets[endpoint] = bucket
+        return bucket
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        return min(30, 0.25 * 2 ** attempt) + random.random() * 0.1
+
+    @staticmethod
+    def _is_rate_limited(response: httpx.Response) -> bool:
+        return response.status_code == 429 or response.content.startswith(
+            b'{"ok":false,"error":"ratelimited"'
+        )
+
+    async def _request(self, method: str, endpoint: str, **kwargs: Any) -> httpx.Response:
+        """Send a throttled request to a Slack Web API method, retrying transient failures"""
+        bucket = self._bucket(endpoint)
+        # A POST that reached Slack may already have taken effect, so only GETs retry
+        # timeouts and 5xx answers; rate limits and connection failures are always safe
+        idempotent = method == "GET"
+        for attempt in range(MAX_ATTEMPTS):
+            last_attempt = attempt == MAX_ATTEMPTS - 1
+            await bucket.acquire()
+            try:
+                async with self._sem:
+                    response = await self._client.request(method, f"/{endpoint}", **kwargs)
+            except httpx.RequestError as error:
+                if last_attempt or not (idempotent or isinstance(error, UNSENT_ERRORS)):
+                    raise
+                logger.debug("Retrying %s after %r", endpoint, error)
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+
+            retryable = self._is_rate_limited(response) or (
+                idempotent and response.status_code in RETRY_STATUSES
+            )
+            if last_attempt or not retryable:
+                return response
+
+            retry_after = response.headers.get("Retry-After")
+            delay = float(retry_after) if retry_after else self._backoff(attempt)
+            logger.debug("Retrying %s in %.2fs (HTTP %s)", endpoint, delay, response.status_code)
+            await asyncio.sleep(delay)
+        return response
+
+    @staticmethod
+    def _json(response: httpx.Response) -> Dict[str, Any]:
+        data = orjson.loads(response.content)
+        if data.get("ok") is False and data.get("error") in AUTH_ERRORS:
+            raise SlackAuthError(data["error"])
+        return data
+
+    async def _coalesce(self, key: Tuple[str, str], fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Share one in-flight lookup between concurrent callers asking for the same key"""
+        inflight = self._inflight
+        task = inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            inflight[key] = task
+            task.add_done_callback(lambda _: inflight.pop(key, None))
+        # Shielded so one caller being cancelled does not cancel the others' lookup
+        return await asyncio.shield(task)
+
+    @classmethod
+    def _text(cls, response: httpx.Response) -> str:
+        # Anything but a 2xx (e.g. an HTML 502 page once retries run out) is an error,
+        # not a body to pass through
+        response.raise_for_status()
+        # Slack's compact JSON always leads with "ok", so only failed calls need decoding
+        if response.content.startswith(b'{"ok":false'):
+            cls._json(response)
+        return response.text
+
+    async def get_channels(self, limit: int = 100, cursor: Optional[str] = None) -> str:
+        params = {**self._base_channel_params, "limit": str(min(limit, 200))}
         
         if cursor:
             params["cursor"] = cursor
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"https://slack.com/api/conversations.list?{urlencode(params)}",
-                headers=self.bot_headers,
-            )
-            return response.json()
+        response = await self._request("GET", "conversations.list", params=params)
+        return self._text(response)
         
     async def get_conversation_info(self, channel_id: str) -> Dict[str, Any]:
-        async with httpx.AsyncClient() as client:
-            params = {"channel": channel_id}
-            
-            response = await client.get(
-                f"https://slack.com/api/conversations.info?{urlencode(params)}",
-                headers=self.bot_headers
-            )
-            data = response.json()
-            
-            if data.get("ok") and data.get("channel") and not data["channel"].get("is_archived"):
-                return data["channel"]
+        cached = self._channel_cache.get(channel_id)
+        if cached is not None:
+            return cached
+        return await self._coalesce(
+            ("conversation", channel_id), lambda: self._fetch_conversation_info(channel_id)
+        )
+
+    async def _fetch_conversation_info(self, channel_id: str) -> Dict[str, Any]:
+        # Bound before the request so a workspace switch mid-call cannot leak into the new cache
+        cache = self._channel_cache
+        params = {"channel": channel_id}
+
+        response = await self._request("GET", "conversations.info", params=params)
+        # Archived channels are answered with None anyway, so skip decoding their body
+        if b'"is_archived":true' in response.content:
+            return None
+        data = self._json(response)
+
+        if data.get("ok") and data.get("channel") and not data["channel"].get("is_archived"):
+            cache.set(channel_id, data["channel"])
+            return data["channel"]
 
     async def post_message(self, channel_id: str, text: str) -> Dict[str, Any]:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://slack.com/api/chat.postMessage",
-                headers=self.bot_headers,
-                json={
-                    "channel": channel_id,
-                    "text": text,
-                },
-            )
-            return response.json()
+        response = await self._request(
+            "POST",
+            "chat.postMessage",
+            content=orjson.dumps({
+                "channel": channel_id,
+                "text": text,
+            }),
+        )
+        return self._json(response)
 
     async def post_reply(self, channel_id: str, thread_ts: str, text: str) -> Dict[str, Any]:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://slack.com/api/chat.postMessage",
-                headers=self.bot_headers,
-                json={
-                    "channel": channel_id,
-                    "thread_ts": thread_ts,
-                    "text": text,
-                },
-            )
-            return response.json()
+        response = await self._request(
+            "POST",
+            "chat.postMessage",
+            content=orjson.dumps({
+                "channel": channel_id,
+                "thread_ts": thread_ts,
+                "text": text,
+            }),
+        )
+        return self._json(response)
 
     async def add_reaction(self, channel_id: str, timestamp: str, reaction: str) -> Dict[str, Any]:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://slack.com/api/reactions.add",
-                headers=self.bot_headers,
-                json={
-                    "channel": channel_id,
-                    "timestamp": timestamp,
-                    "name": reaction,
-                },
-            )
-            return response.json()
+        response = await self._request(
+            "POST",
+            "reactions.add",
+            content=orjson.dumps({
+                "channel": channel_id,
+                "timestamp": timestamp,
+                "name": reaction,
+            }),
+        )
+        return self._json(response)
 
-    async def get_channel_history(self, channel_id: str, limit: int = 10) -> Dict[str, Any]:
+    async def get_channel_history(self, channel_id: str, limit: int = 10) -> str:
         params = {
             "channel": channel_id,
             "limit": str(limit),
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"https://slack.com/api/conversations.history?{urlencode(params)}",
-                headers=self.bot_headers,
-            )
-            return response.json()
+        response = await self._request("GET", "conversations.history", params=params)
+        return self._text(response)
 
-    async def get_thread_replies(self, channel_id: str, thread_ts: str) -> Dict[str, Any]:
+    async def get_thread_replies(self, channel_id: str, thread_ts: str) -> str:
         params = {
             "channel": channel_id,
             "ts": thread_ts,
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"https://slack.com/api/conversations.replies?{urlencode(params)}",
-                headers=self.bot_headers,
-            )
-            return response.json()
+        response = await self._request("GET", "conversations.replies", params=params)
+        return self._text(response)
 
-    async def get_users(self, limit: int = 100, cursor: Optional[str] = None) -> Dict[str, Any]:
-        params = {
-            "limit": str(min(limit, 200)),
-            "team_id": self.team_id,
-        }
+    async def get_users(self, limit: int = 100, cursor: Optional[str] = None) -> str:
+        params = {**self._base_user_params, "limit": str(min(limit, 200))}
         
         if cursor:
             params["cursor"] = cursor
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"https://slack.com/api/users.list?{urlencode(params)}",
-                headers=self.bot_headers,
-            )
-            return response.json()
-
-    async def get_user_profile(self, user_id: str) -> Dict[str, Any]:
+        response = await self._request("GET", "users.list", params=params)
+        return self._text(response)
+
+    async def get_user_profile(self, user_id: str) -> str:
+        cached = self._profile_cache.get(user_id)
+        if cached is not None:
+            return cached
+        return await self._coalesce(("profile", user_id), lambda: self._fetch_user_profile(user_id))
+
+    async def _fetch_user_profile(self, user_id: str) -> str:
+        # Bound before the request so a workspace switch mid-call cannot leak into the new cache
+        cache = self._profile_cache
         params = {
             "user": user_id,
             "include_labels": "true",
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"https://slack.com/api/users.profile.get?{urlencode(params)}",
-                headers=self.bot_headers,
-            )
-            return response.json()
+        response = await self._request("GET", "users.profile.get", params=params)
+        text = self._text(response)
+
+        # Only successful lookups are cached so errors are retried on the next call
+        if response.content.startswith(b'{"ok":true'):
+            cache.set(user_id, text)
+        return text
 
 
 # Tool definitions
@@ -303,6 +529,25 @@ TOOLS = [
             "required": ["user_id"],
         },
     ),
+    Tool(
+        name="slack_get_channel_overview",
+        description="Get information about a channel together with its recent messages",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "channel_id": {
+                    "type": "string",
+                    "description": "The ID of the channel",
+                },
+                "limit": {
+                    "type": "number",
+                    "description": "Number of messages to retrieve (default 10)",
+                    "default": 10,
+                },
+            },
+            "required": ["channel_id"],
+        },
+    ),
     Tool(
         name="get_conversation_info",
         description="Get information about a specific conversation (channel or DM)",
@@ -319,143 +564,258 @@ TOOLS = [
     ),
 ]
 
+# TOOLS never changes at runtime, so list_tools hands out one frozen copy
+_TOOLS_TUPLE = tuple(TOOLS)
+
+
+async def nango_credentials(
+    connection_id: str, integration_id: str, force_refresh: bool = False
+) -> Dict[str, Any]:
+    """Get credentials from Nango, reusing them for CREDENTIALS_TTL seconds"""
+    key = (connection_id, integration_id)
+
+    # Holding the lock across the fetch also collapses concurrent refreshes into one
+    async with _cred_lock:
+        cached = _cred_cache.get(key)
+        if cached and not force_refresh and time.monotonic() - cached[0] < CREDENTIALS_TTL:
+            return cached[1]
+
+        url = f"{NANGO_BASE_URL}/connection/{connection_id}"
+        params = {
+            "provider_config_key": integration_id,
+            "refresh_token": "true",
+        }
+        headers = {"Authorization": f"Bearer {NANGO_SECRET_KEY}"}
+        async with httpx.AsyncClient() as client:
+            response = await client.get(
+                url, headers=headers,params=params,
+            )
+            response.raise_for_status()
+            credentials = orjson.loads(response.content)
+
+        _cred_cache[key] = (time.monotonic(), credentials)
+        return credentials
+
+
+# Argument models, one per tool, mirroring the inputSchema of its Tool definition
+@dataclass(slots=True)
+class ListChannelsArgs:
+    limit: int = 100
+    cursor: Optional[str] = None
+
+
+@dataclass(slots=True)
+class ConversationInfoArgs:
+    channel_id: str
+
+
+@dataclass(slots=True)
+class PostMessageArgs:
+    channel_id: str
+    text: str
+
+
+@dataclass(slots=True)
+class ReplyToThreadArgs:
+    channel_id: str
+    thread_ts: str
+    text: str
+
+
+@dataclass(slots=True)
+class AddReactionArgs:
+    channel_id: str
+    timestamp: str
+    reaction: str
+
+
+@dataclass(slots=True)
+class ChannelHistoryArgs:
+    channel_id: str
+    limit: int = 10
+
+
+@dataclass(slots=True)
+class ChannelOverviewArgs:
+    channel_id: str
+    limit: int = 10
+
+
+@dataclass(slots=True)
+class ThreadRepliesArgs:
+    channel_id: str
+    thread_ts: str
 
-async def nango_credentials(connection_id: str, integration_id: str) -> Dict[str, Any]:
-    """Get credentials from Nango"""
-    base_url = os.environ.get("NANGO_BASE_URL")
-    secret_key = os.environ.get("NANGO_SECRET_KEY")
-    
-    url = f"{base_url}/connection/{connection_id}"
-    params = {
-        "provider_config_key": integration_id,
-        "refresh_token": "true",
-    }
-    headers = {"Authorization": f"Bearer {secret_key}"}
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            url, headers=headers,params=params,
-        )
-        response.raise_for_status()
-        return response.json()
 
+@dataclass(slots=True)
+class GetUsersArgs:
+    limit: int = 100
+    cursor: Optional[str] = None
 
 
+@dataclass(slots=True)
+class UserProfileArgs:
+    user_id: str
+
+
+async def _conversation_info(slack_client: SlackClient, args: ConversationInfoArgs) -> Dict[str, Any]:
+    response = await slack_client.get_conversation_info(args.channel_id)
+    return response or {"error": "Channel not found or is archived"}
+
+
+async def _channel_overview(slack_client: SlackClient, args: ChannelOverviewArgs) -> Dict[str, Any]:
+    # The two reads are independent, so they go out together over the shared connection
+    info, history = await asyncio.gather(
+        slack_client.get_conversation_info(args.channel_id),
+        slack_client.get_channel_history(args.channel_id, args.limit),
+    )
+    if not info:
+        return {"error": "Channel not found or is archived"}
+    # History is already JSON text; Fragment embeds it without decoding it again
+    return {"channel": info, "history": orjson.Fragment(history)}
+
+
+Handler = Callable[[SlackClient, Any], Awaitable[Any]]
+
+# Tool name -> (argument model, coroutine that calls the matching SlackClient method)
+HANDLERS: Dict[str, Tuple[type, Handler]] = {
+    "slack_list_channels": (ListChannelsArgs, lambda c, a: c.get_channels(a.limit, a.cursor)),
+    "get_conversation_info": (ConversationInfoArgs, _conversation_info),
+    "slack_post_message": (PostMessageArgs, lambda c, a: c.post_message(a.channel_id, a.text)),
+    "slack_reply_to_thread": (
+        ReplyToThreadArgs,
+        lambda c, a: c.post_reply(a.channel_id, a.thread_ts, a.text),
+    ),
+    "slack_add_reaction": (
+        AddReactionArgs,
+        lambda c, a: c.add_reaction(a.channel_id, a.timestamp, a.reaction),
+    ),
+    "slack_get_channel_history": (
+        ChannelHistoryArgs,
+        lambda c, a: c.get_channel_history(a.channel_id, a.limit),
+    ),
+    "slack_get_channel_overview": (ChannelOverviewArgs, _channel_overview),
+    "slack_get_thread_replies": (
+        ThreadRepliesArgs,
+        lambda c, a: c.get_thread_replies(a.channel_id, a.thread_ts),
+    ),
+    "slack_get_users": (GetUsersArgs, lambda c, a: c.get_users(a.limit, a.cursor)),
+    "slack_get_user_profile": (UserProfileArgs, lambda c, a: c.get_user_profile(a.user_id)),
+}
+
+
+# Per argument model: every field name, and the required fields (those without a default)
+_ARG_FIELDS: Dict[type, Tuple[frozenset, Tuple[str, ...]]] = {
+    args_cls: (
+        frozenset(field.name for field in fields(args_cls)),
+        tuple(field.name for field in fields(args_cls) if field.default is MISSING),
+    )
+    for args_cls, _ in HANDLERS.values()
+}
+
+
+def _missing_arguments_error(required: Tuple[str, ...]) -> ValueError:
+    if len(required) == 1:
+        return ValueError(f"Missing required argument: {required[0]}")
+    if len(required) == 2:
+        return ValueError(f"Missing required arguments: {required[0]} and {required[1]}")
+    return ValueError(f"Missing required arguments: {', '.join(required[:-1])}, and {required[-1]}")
+
+
+def resolve_tool(name: str, arguments: Dict[str, Any]) -> Tuple[Handler, Any]:
+    """Look up the handler for a tool and bind its arguments to the tool's model"""
+    entry = HANDLERS.get(name)
+    if entry is None:
+        raise ValueError(f"Unknown tool: {name}")
+
+    args_cls, handler = entry
+    known, required = _ARG_FIELDS[args_cls]
+    # The dataclasses do not check values, so reject null or empty required fields here
+    if any(not arguments.get(field) for field in required):
+        raise _missing_arguments_error(required)
+
+    # Keys outside the schema are ignored rather than failing the whole call
+    args = args_cls(**{key: value for key, value in arguments.items() if key in known})
+    return handler, args
+
 
 async def main():
     """Main function to run the Slack MCP server."""
 
-    print(f"Starting Slack MCP Server v1.0.0 (MCP )...", file=sys.stderr)
+    logger.info("Starting Slack MCP Server v1.0.0 (MCP )...")
     
+    # Tasks started by gather() and _coalesce() run synchronously until their first real await.
+    # uvloop's create_task is not compatible with the eager factory, so only the stdlib loop gets it
+    loop = asyncio.get_running_loop()
+    if isinstance(loop, asyncio.BaseEventLoop):
+        loop.set_task_factory(asyncio.eager_task_factory)
+
     server = Server("Slack MCP Server")
+    slack_client: Optional[SlackClient] = None
 
     @server.list_tools()
-    async def list_tools() -> List[Tool]:
-        print("Received ListToolsRequest", file=sys.stderr)
-        return TOOLS
+    async def list_tools() -> Sequence[Tool]:
+        logger.debug("Received ListToolsRequest")
+        return _TOOLS_TUPLE
 
-    @server.call_tool()
-    async def call_tool(name: str, arguments: Dict[str, Any]) -> Sequence[TextContent]:
-        print(f"Received CallToolRequest: {name}", file=sys.stderr)
+    async def get_slack_client(force_refresh: bool = False) -> SlackClient:
+        nonlocal slack_client
         credentials = await nango_credentials(
-            connection_id=os.getenv("NANGO_CONNECTION_ID"),
-            integration_id=os.getenv("NANGO_INTEGRATION_ID"),
+            connection_id=NANGO_CONNECTION_ID,
+            integration_id=NANGO_INTEGRATION_ID,
+            force_refresh=force_refresh,
         )
         bot_token = credentials.get("credentials", {}).get("access_token")
         team_id = credentials.get("connection_config", {}).get("team.id")
-            
-        slack_client = SlackClient(bot_token=bot_token, team_id=team_id)
-        
+
+        # Built on first use and then kept for the life of the server, so every
+        # call shares one connection pool; a rotated token is swapped in place
+        if slack_client is None:
+            slack_client = SlackClient(bot_token=bot_token, team_id=team_id)
+        elif slack_client.bot_token != bot_token or slack_client.team_id != team_id:
+            slack_client.set_credentials(bot_token, team_id)
+        return slack_client
+
+    @server.call_tool()
+    async def call_tool(name: str, arguments: Dict[str, Any]) -> Sequence[TextContent]:
+        logger.debug("Received CallToolRequest: %s", name)
+
         try:
-            if name == "slack_list_channels":
-                limit = arguments.get("limit", 100)
-                cursor = arguments.get("cursor")
-                response = await slack_client.get_channels(limit, cursor)
-                return [TextContent(type="text", text=json.dumps(response))]
-
-            elif name == "get_conversation_info":
-                channel_id = arguments.get("channel_id")
-                if not channel_id:
-                    raise ValueError("Missing required argument: channel_id")
-                response = await slack_client.get_conversation_info(channel_id)
-                if response:
-                    return [TextContent(type="text", text=json.dumps(response))]
-                else:
-                    return [TextContent(type="text", text=json.dumps({"error": "Channel not found or is archived"}))]
-
-            elif name == "slack_post_message":
-                channel_id = arguments.get("channel_id")
-                text = arguments.get("text")
-                if not channel_id or not text:
-                    raise ValueError("Missing required arguments: channel_id and text")
-                response = await slack_client.post_message(channel_id, text)
-                return [TextContent(type="text", text=json.dumps(response))]
-
-            elif name == "slack_reply_to_thread":
-                channel_id = arguments.get("channel_id")
-                thread_ts = arguments.get("thread_ts")
-                text = arguments.get("text")
-                if not channel_id or not thread_ts or not text:
-                    raise ValueError("Missing required arguments: channel_id, thread_ts, and text")
-                response = await slack_client.post_reply(channel_id, thread_ts, text)
-                return [TextContent(type="text", text=json.dumps(response))]
-
-            elif name == "slack_add_reaction":
-                channel_id = arguments.get("channel_id")
-                timestamp = arguments.get("timestamp")
-                reaction = arguments.get("reaction")
-                if not channel_id or not timestamp or not reaction:
-                    raise ValueError("Missing required arguments: channel_id, timestamp, and reaction")
-                response = await slack_client.add_reaction(channel_id, timestamp, reaction)
-                return [TextContent(type="text", text=json.dumps(response))]
-
-            elif name == "slack_get_channel_history":
-                channel_id = arguments.get("channel_id")
-                if not channel_id:
-                    raise ValueError("Missing required argument: channel_id")
-                limit = arguments.get("limit", 10)
-                response = await slack_client.get_channel_history(channel_id, limit)
-                return [TextContent(type="text", text=json.dumps(response))]
-
-            elif name == "slack_get_thread_replies":
-                channel_id = arguments.get("channel_id")
-                thread_ts = arguments.get("thread_ts")
-                if not channel_id or not thread_ts:
-                    raise ValueError("Missing required arguments: channel_id and thread_ts")
-                response = await slack_client.get_thread_replies(channel_id, thread_ts)
-                return [TextContent(type="text", text=json.dumps(response))]
-
-            elif name == "slack_get_users":
-                limit = arguments.get("limit", 100)
-                cursor = arguments.get("cursor")
-                response = await slack_client.get_users(limit, cursor)
-                return [TextContent(type="text", text=json.dumps(response))]
-
-            elif name == "slack_get_user_profile":
-                user_id = arguments.get("user_id")
-                if not user_id:
-                    raise ValueError("Missing required argument: user_id")
-                response = await slack_client.get_user_profile(user_id)
-                return [TextContent(type="text", text=json.dumps(response))]
-
-            else:
-                raise ValueError(f"Unknown tool: {name}")
+            # Validate first so bad calls never cost a Nango round-trip
+            handler, args = resolve_tool(name, arguments)
+            client = await get_slack_client()
+            try:
+                response = await handler(client, args)
+            except SlackAuthError:
+                # The cached token was revoked or rotated; refetch it and retry once
+                client = await get_slack_client(force_refresh=True)
+                response = await handler(client, args)
+            # Passthrough reads hand back Slack's JSON body untouched
+            if not isinstance(response, str):
+                response = orjson.dumps(response).decode()
+            return [TextContent(type="text", text=response)]
 
         except Exception as error:
-            print(f"Error executing tool: {error}", file=sys.stderr)
+            logger.error("Error executing tool: %s", error)
             return [TextContent(
                 type="text",
-                text=json.dumps({"error": str(error)})
+                text=orjson.dumps({"error": str(error)}).decode()
             )]
 
-    async with stdio_server() as (read_stream, write_stream):
-        print("Connecting server to transport...", file=sys.stderr)
-        await server.run(read_stream, write_stream, server.create_initialization_options())
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            logger.info("Connecting server to transport...")
+            await server.run(read_stream, write_stream, server.create_initialization_options())
+    finally:
+        if slack_client is not None:
+            await slack_client.aclose()
 
 
 def run():
     """Run the main function in an asyncio event loop."""
+    loop_factory = uvloop.new_event_loop if uvloop is not None else None
     try:
-        asyncio.run(main())
+        asyncio.run(main(), loop_factory=loop_factory)
     except Exception as error:
-        print(f"Fatal error in main(): {error}", file=sys.stderr)
+        logger.critical("Fatal error in main(): %s", error)
         sys.exit(1)
\ No newline at end of file